@@ -0,0 +1,120 @@
+"""
+cache_store.py - On-disk cache for Manifold API lookups
+
+Persists market and user objects in a small SQLite database so a
+restarted bot does not have to re-fetch everything over the network.
+Timestamps are wall-clock epoch seconds so they survive restarts.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CacheStore:
+    """
+    SQLite-backed store for market and user objects.
+
+    Safe to share between threads. Writes are batched until flush(), which
+    also deletes rows too old to ever be returned again.
+    """
+
+    def __init__(self, path: str, market_max_age: float, user_max_age: float):
+        """
+        Open (or create) the store.
+
+        Args:
+            path: SQLite file
+            market_max_age: Seconds after which a saved market is deleted
+            user_max_age: Seconds after which a saved user is deleted
+        """
+        self.path = path
+        self.market_max_age = market_max_age
+        self.user_max_age = user_max_age
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS markets ("
+                "id TEXT PRIMARY KEY, data TEXT NOT NULL, etag TEXT, fetched_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS users ("
+                "id TEXT PRIMARY KEY, data TEXT NOT NULL, fetched_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        self.flush()  # Drop what expired while the bot was stopped
+
+    def get_market(self, market_id: str, max_age: float) -> Optional[tuple[float, dict, Optional[str]]]:
+        """
+        Load a market saved within the last max_age seconds.
+
+        Returns:
+            Tuple of (fetched_at, market, etag) or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fetched_at, data, etag FROM markets WHERE id = ?", (market_id,)
+            ).fetchone()
+        if row is None or time.time() - row[0] > max_age:
+            return None
+        return row[0], json.loads(row[1]), row[2]
+
+    def put_market(self, market_id: str, market: dict, etag: Optional[str], fetched_at: float):
+        """Save (or replace) a market"""
+        data = json.dumps(market)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO markets (id, data, etag, fetched_at) VALUES (?, ?, ?, ?)",
+                (market_id, data, etag, fetched_at)
+            )
+
+    def get_user(self, user_id: str, max_age: float) -> Optional[tuple[float, dict]]:
+        """
+        Load a user saved within the last max_age seconds.
+
+        Returns:
+            Tuple of (fetched_at, user) or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fetched_at, data FROM users WHERE id = ?", (user_id,)
+            ).fetchone()
+        if row is None or time.time() - row[0] > max_age:
+            return None
+        return row[0], json.loads(row[1])
+
+    def put_user(self, user_id: str, user: dict, fetched_at: float):
+        """Save (or replace) a user"""
+        data = json.dumps(user)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO users (id, data, fetched_at) VALUES (?, ?, ?)",
+                (user_id, data, fetched_at)
+            )
+
+    def flush(self):
+        """Delete expired rows and commit pending writes to disk"""
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "DELETE FROM markets WHERE fetched_at < ?", (now - self.market_max_age,)
+                )
+                self._conn.execute(
+                    "DELETE FROM users WHERE fetched_at < ?", (now - self.user_max_age,)
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning("Failed to save cache to %s: %s", self.path, e)
+
+    def close(self):
+        """Commit and close the database"""
+        self.flush()
+        with self._lock:
+            self._conn.close()
@@ -9,11 +9,18 @@ Rate limit: 500 requests/minute
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+import threading
 import time
 import logging
 from typing import Optional
 from datetime import datetime, timezone
 
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optional; stdlib json also parses bytes
+    from json import loads as json_loads
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -23,6 +30,8 @@ REQUEST_TIMEOUT = 30  # seconds
 MAX_RETRIES = 3
 RETRY_DELAY = 2  # seconds
 
+_UTC = timezone.utc
+
 
 class ManifoldAPIError(Exception):
     """Custom exception for Manifold API errors"""
@@ -31,33 +40,54 @@ class ManifoldAPIError(Exception):
 
 class RateLimiter:
     """
-    Simple rate limiter to respect API limits.
+    Token-bucket rate limiter to respect API limits.
     Manifold allows 500 requests/minute.
+
+    The bucket holds up to max_requests tokens and refills continuously
+    at max_requests / window_seconds tokens per second. Safe to share
+    between threads.
     """
     def __init__(self, max_requests: int = 400, window_seconds: int = 60):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.requests = []
+        self.rate = max_requests / window_seconds
+        self.capacity = float(max_requests)
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
 
     def wait_if_needed(self):
         """Block if we're approaching rate limit"""
-        now = time.time()
-        # Remove old requests outside the window
-        self.requests = [r for r in self.requests if now - r < self.window_seconds]
-
-        if len(self.requests) >= self.max_requests:
-            # Wait until oldest request exits the window
-            sleep_time = self.window_seconds - (now - self.requests[0]) + 0.1
-            if sleep_time > 0:
-                logger.warning(f"Rate limit approaching, waiting {sleep_time:.1f}s")
+        with self._lock:
+            now = time.monotonic()
+            # Refill tokens for the time elapsed since the last call
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+
+            if self.tokens < 1:
+                # Wait until one full token is available (other threads queue on the lock)
+                sleep_time = (1 - self.tokens) / self.rate
+                logger.warning("Rate limit approaching, waiting %.1fs", sleep_time)
                 time.sleep(sleep_time)
-
-        self.requests.append(time.time())
+                self.tokens = 0.0
+                self.last_refill = time.monotonic()
+            else:
+                self.tokens -= 1
 
 
 # Global rate limiter instance
 rate_limiter = RateLimiter()
 
+# Shared HTTP session so connections (and TLS handshakes) are reused across calls.
+# requests already sends Accept-Encoding for every codec urllib3 can decode
+# (gzip/deflate, plus br when brotli is installed), so responses arrive compressed.
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=50, max_retries=0))
+session.headers.update({"Accept": "application/json"})
+
+# Returned by conditional requests when the server answers 304 Not Modified
+NOT_MODIFIED = object()
+
 
 def _make_request(endpoint: str, params: Optional[dict] = None) -> dict | list:
     """
@@ -70,40 +100,69 @@ def _make_request(endpoint: str, params: Optional[dict] = None) -> dict | list:
     Returns:
         JSON response data
 
+    Raises:
+        ManifoldAPIError: If request fails after retries
+    """
+    return _make_conditional_request(endpoint, params)[0]
+
+
+def _make_conditional_request(
+    endpoint: str,
+    params: Optional[dict] = None,
+    etag: Optional[str] = None
+) -> tuple:
+    """
+    Make a GET request, revalidating with If-None-Match when an ETag is given.
+
+    Args:
+        endpoint: API endpoint (without base URL)
+        params: Query parameters
+        etag: ETag from a previous response for the same resource
+
+    Returns:
+        Tuple of (data, etag). data is NOT_MODIFIED on a 304 response
+        and None on a 404.
+
     Raises:
         ManifoldAPIError: If request fails after retries
     """
     url = f"{BASE_URL}{endpoint}"
+    headers = {"If-None-Match": etag} if etag else None
 
     for attempt in range(MAX_RETRIES):
         try:
             rate_limiter.wait_if_needed()
 
-            response = requests.get(
+            response = session.get(
                 url,
                 params=params,
-                timeout=REQUEST_TIMEOUT,
-                headers={"Accept": "application/json"}
+                headers=headers,
+                timeout=REQUEST_TIMEOUT
             )
 
             if response.status_code == 200:
-                return response.json()
+                return json_loads(response.content), response.headers.get("ETag")
+            elif response.status_code == 304:
+                return NOT_MODIFIED, etag
             elif response.status_code == 429:
                 # Rate limited - wait and retry
                 wait_time = RETRY_DELAY * (attempt + 1) * 2
-                logger.warning(f"Rate limited, waiting {wait_time}s before retry")
+                logger.warning("Rate limited, waiting %ss before retry", wait_time)
                 time.sleep(wait_time)
                 continue
             elif response.status_code == 404:
-                logger.debug(f"Resource not found: {endpoint}")
-                return None
+                logger.debug("Resource not found: %s", endpoint)
+                return None, None
             else:
-                logger.error(f"API error {response.status_code}: {response.text[:200]}")
+                logger.error("API error %s: %s", response.status_code, response.text[:200])
 
         except requests.exceptions.Timeout:
-            logger.warning(f"Request timeout (attempt {attempt + 1}/{MAX_RETRIES})")
+            logger.warning("Request timeout (attempt %d/%d)", attempt + 1, MAX_RETRIES)
         except requests.exceptions.RequestException as e:
-            logger.error(f"Request error: {e}")
+            logger.error("Request error: %s", e)
+        except ValueError as e:
+            # Malformed JSON body (orjson.JSONDecodeError and json.JSONDecodeError are both ValueErrors)
+            logger.error("Invalid JSON from %s: %s", endpoint, e)
 
         if attempt < MAX_RETRIES - 1:
             time.sleep(RETRY_DELAY * (attempt + 1))
@@ -145,6 +204,21 @@ def get_market_details(market_id: str) -> Optional[dict]:
     return _make_request(f"/market/{market_id}")
 
 
+def get_market_details_if_modified(market_id: str, etag: Optional[str] = None) -> tuple:
+    """
+    Fetch market details, skipping the body if it has not changed.
+
+    Args:
+        market_id: The market ID
+        etag: ETag from the previous fetch of this market
+
+    Returns:
+        Tuple of (market, etag); market is a FullMarket object,
+        NOT_MODIFIED, or None
+    """
+    return _make_conditional_request(f"/market/{market_id}", etag=etag)
+
+
 def get_market_bets(
     contract_id: str = None,
     limit: int = 100,
@@ -242,7 +316,7 @@ def get_user_bets(user_id: str = None, username: str = None, limit: int = 100) -
 
 def timestamp_to_datetime(timestamp_ms: int) -> datetime:
     """Convert millisecond timestamp to datetime"""
-    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)
+    return datetime.fromtimestamp(timestamp_ms / 1000, _UTC)
 
 
 def datetime_to_timestamp(dt: datetime) -> int:
@@ -6,7 +6,7 @@ A simple, robust console-based alert bot that monitors Manifold Markets
 for suspicious trading activity and displays alerts in real-time.
 
 Usage:
-    python main.py [--interval SECONDS] [--debug]
+    python main.py [--interval SECONDS] [--workers N] [--debug]
 
 Signals detected:
     - WHALE_BET: Large bets (≥5x market average)
@@ -19,15 +19,20 @@ import argparse
 import logging
 import signal
 import sys
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import Optional
 
+from cache_store import CacheStore
 from data_fetcher import (
     get_recent_bets,
-    get_market_details,
+    get_market_details_if_modified,
     get_user_by_id,
-    ManifoldAPIError
+    ManifoldAPIError,
+    NOT_MODIFIED
 )
 from signal_engine import SignalEngine, Alert, SignalType
 
@@ -52,6 +57,21 @@ SIGNAL_COLORS = {
     SignalType.HIGH_SKILL_USER: Colors.CYAN,
 }
 
+# Market cache limits (stale markets are revalidated with their ETag)
+MARKET_CACHE_SIZE = 500
+MARKET_REFRESH_INTERVAL = 10 * 60  # seconds
+MARKET_DB_MAX_AGE = 24 * 60 * 60  # seconds a market saved on disk is reused after a restart
+
+# User cache limits (profit/age must stay reasonably fresh for skill/new-account signals)
+USER_CACHE_SIZE = 500
+USER_CACHE_TTL = 30 * 60  # seconds
+
+# How often old market stats are pruned from the signal engine
+CLEANUP_INTERVAL = 5 * 60  # seconds
+
+# Shortest interval the scan loop adapts down to when bets arrive faster than we fetch them
+MIN_SCAN_INTERVAL = 10  # seconds
+
 
 def setup_logging(debug: bool = False):
     """Configure logging for the application"""
@@ -74,6 +94,27 @@ def format_amount(amount: float) -> str:
     return f"M{amount:,.0f}"
 
 
+def _alert_frame(signal_type: SignalType, color: str) -> tuple[str, str]:
+    """Build the colored header and footer lines of an alert"""
+    header = (
+        f"{color}{Colors.BOLD}{'=' * 60}{Colors.RESET}\n"
+        f"{color}{Colors.BOLD}[ALERT] {signal_type.value}{Colors.RESET}"
+    )
+    return header, f"{color}{'=' * 60}{Colors.RESET}"
+
+
+# Per-signal alert header and footer, built once instead of on every alert
+_ALERT_HEADERS = {
+    signal_type: _alert_frame(signal_type, color)
+    for signal_type, color in SIGNAL_COLORS.items()
+}
+
+
+def _label(name: str, value) -> str:
+    """Format one bold-labelled alert line"""
+    return f"{Colors.BOLD}{name}:{Colors.RESET} {value}"
+
+
 def print_alert(alert: Alert):
     """
     Print an alert to the console with formatting.
@@ -85,39 +126,48 @@ def print_alert(alert: Alert):
     Bet Amount: <amount>
     Probability: <before> -> <after>
     Timestamp: <UTC>
+
+    The whole alert is emitted with a single write so it never interleaves
+    with the status line.
     """
-    color = SIGNAL_COLORS.get(alert.signal_type, Colors.RESET)
-
-    print()
-    print(f"{color}{Colors.BOLD}{'=' * 60}{Colors.RESET}")
-    print(f"{color}{Colors.BOLD}[ALERT] {alert.signal_type.value}{Colors.RESET}")
-    print(f"{Colors.BOLD}Market:{Colors.RESET} {alert.market_name[:80]}")
-    print(f"{Colors.BOLD}User:{Colors.RESET} {alert.username}")
-    print(f"{Colors.BOLD}Bet Amount:{Colors.RESET} {format_amount(alert.bet_amount)}")
-    print(f"{Colors.BOLD}Probability:{Colors.RESET} {format_probability(alert.prob_before)} -> {format_probability(alert.prob_after)}")
-    print(f"{Colors.BOLD}Timestamp:{Colors.RESET} {alert.timestamp.strftime('%Y-%m-%d %H:%M:%S UTC')}")
-
-    # Print additional details based on signal type
-    if alert.signal_type == SignalType.WHALE_BET:
+    # Signal types without a color fall back to the terminal's default
+    frame = _ALERT_HEADERS.get(alert.signal_type)
+    header, footer = frame or _alert_frame(alert.signal_type, Colors.RESET)
+
+    lines = [
+        "",
+        header,
+        _label("Market", alert.market_name[:80]),
+        _label("User", alert.username),
+        _label("Bet Amount", format_amount(alert.bet_amount)),
+        _label("Probability", f"{format_probability(alert.prob_before)} -> {format_probability(alert.prob_after)}"),
+        _label("Timestamp", alert.timestamp.strftime('%Y-%m-%d %H:%M:%S UTC')),
+    ]
+
+    # Additional details based on signal type
+    if alert.signal_type is SignalType.WHALE_BET:
         multiplier = alert.details.get("multiplier", 0)
         avg_bet = alert.details.get("market_avg_bet", 0)
-        print(f"{Colors.BOLD}Details:{Colors.RESET} {multiplier:.1f}x market avg (avg: {format_amount(avg_bet)})")
+        lines.append(_label("Details", f"{multiplier:.1f}x market avg (avg: {format_amount(avg_bet)})"))
 
-    elif alert.signal_type == SignalType.NEW_ACCOUNT_LARGE_BET:
+    elif alert.signal_type is SignalType.NEW_ACCOUNT_LARGE_BET:
         age = alert.details.get("account_age_days", 0)
-        print(f"{Colors.BOLD}Details:{Colors.RESET} Account age: {age} days")
+        lines.append(_label("Details", f"Account age: {age} days"))
 
-    elif alert.signal_type == SignalType.SHARP_MOVEMENT:
+    elif alert.signal_type is SignalType.SHARP_MOVEMENT:
         movement = alert.details.get("total_movement", 0)
         window = alert.details.get("window_minutes", 5)
-        print(f"{Colors.BOLD}Details:{Colors.RESET} {format_probability(movement)} movement in {window} min")
+        lines.append(_label("Details", f"{format_probability(movement)} movement in {window} min"))
 
-    elif alert.signal_type == SignalType.HIGH_SKILL_USER:
+    elif alert.signal_type is SignalType.HIGH_SKILL_USER:
         profit = alert.details.get("all_time_profit", 0)
-        print(f"{Colors.BOLD}Details:{Colors.RESET} All-time profit: {format_amount(profit)}")
+        lines.append(_label("Details", f"All-time profit: {format_amount(profit)}"))
+
+    lines.append(footer)
+    lines.append("\n")
 
-    print(f"{color}{'=' * 60}{Colors.RESET}")
-    print()
+    sys.stdout.write("\n".join(lines))
+    sys.stdout.flush()
 
 
 def print_banner():
@@ -139,18 +189,18 @@ Press Ctrl+C to stop.
 """)
 
 
+_STATUS_FMT = (
+    "\r[{:%H:%M:%S}] Processed {} bets | "
+    "Alerts: {} | "
+    "Markets tracked: {markets_tracked} | "
+    "Users cached: {users_cached}    "
+).format
+
+
 def print_status(last_check: datetime, bets_processed: int, alerts_count: int, engine: SignalEngine):
     """Print status line"""
-    stats = engine.get_stats()
-    timestamp = last_check.strftime("%H:%M:%S")
-    print(
-        f"\r[{timestamp}] Processed {bets_processed} bets | "
-        f"Alerts: {alerts_count} | "
-        f"Markets tracked: {stats['markets_tracked']} | "
-        f"Users cached: {stats['users_cached']}    ",
-        end="",
-        flush=True
-    )
+    sys.stdout.write(_STATUS_FMT(last_check, bets_processed, alerts_count, **engine.get_stats()))
+    sys.stdout.flush()
 
 
 class AlertBot:
@@ -164,7 +214,9 @@ class AlertBot:
         self,
         scan_interval: int = 45,
         bets_per_scan: int = 100,
-        debug: bool = False
+        debug: bool = False,
+        fetch_workers: int = 8,
+        cache_path: Optional[str] = None
     ):
         """
         Initialize the alert bot.
@@ -173,6 +225,8 @@ class AlertBot:
             scan_interval: Seconds between scans (30-60 recommended)
             bets_per_scan: Number of bets to fetch per scan
             debug: Enable debug logging
+            fetch_workers: Threads used to fetch market/user details concurrently
+            cache_path: SQLite file to persist market/user caches across restarts (None disables)
         """
         self.scan_interval = scan_interval
         self.bets_per_scan = bets_per_scan
@@ -180,31 +234,126 @@ class AlertBot:
 
         self.engine = SignalEngine()
         self.running = False
+        self._stop_event = threading.Event()
+        self.current_interval = float(scan_interval)  # Adapts to bet volume, capped at scan_interval
+        self.bets_last_cycle = 0
+        self._last_cleanup = time.monotonic()
         self.last_bet_time: Optional[int] = None  # Timestamp of most recent bet processed
         self.total_alerts = 0
         self.total_bets_processed = 0
 
-        # Market cache to avoid redundant API calls
-        self.market_cache: dict[str, dict] = {}
+        # Market cache: market_id -> (fetched_at monotonic time, market, etag), in LRU order.
+        # Shared with fetch threads.
+        self.market_cache: OrderedDict[str, tuple[float, dict, Optional[str]]] = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        # User cache: user_id -> (fetched_at monotonic time, user_data), in LRU order
+        self.user_cache: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+        # Optional on-disk copy of both caches
+        self.cache_store: Optional[CacheStore] = (
+            CacheStore(cache_path, MARKET_DB_MAX_AGE, USER_CACHE_TTL) if cache_path else None
+        )
+
+        # Thread pool for concurrent per-bet API lookups
+        self._pool = ThreadPoolExecutor(max_workers=fetch_workers)
 
     def _get_market(self, market_id: str) -> Optional[dict]:
-        """Get market details with caching"""
-        if market_id not in self.market_cache:
-            try:
-                market = get_market_details(market_id)
-                if market:
-                    self.market_cache[market_id] = market
-                    # Limit cache size
-                    if len(self.market_cache) > 500:
-                        # Remove oldest entries
-                        oldest_keys = list(self.market_cache.keys())[:100]
-                        for key in oldest_keys:
-                            del self.market_cache[key]
-            except ManifoldAPIError as e:
-                logging.warning(f"Failed to fetch market {market_id}: {e}")
-                return None
-
-        return self.market_cache.get(market_id)
+        """Get market details with caching, revalidating stale entries by ETag"""
+        now = time.monotonic()
+        with self._cache_lock:
+            entry = self.market_cache.get(market_id)
+            if entry is not None:
+                self.market_cache.move_to_end(market_id)
+                if now - entry[0] < MARKET_REFRESH_INTERVAL:
+                    return entry[1]
+
+        if entry is None and self.cache_store:
+            stored = self.cache_store.get_market(market_id, MARKET_DB_MAX_AGE)
+            if stored:
+                # Translate the saved wall-clock time onto the monotonic clock
+                fetched_at, market, etag = stored
+                entry = (now - (time.time() - fetched_at), market, etag)
+                self._store_market(market_id, entry)
+                if now - entry[0] < MARKET_REFRESH_INTERVAL:
+                    return market
+
+        cached_market, etag = (entry[1], entry[2]) if entry else (None, None)
+        try:
+            market, etag = get_market_details_if_modified(market_id, etag)
+        except ManifoldAPIError as e:
+            logging.warning("Failed to fetch market %s: %s", market_id, e)
+            return cached_market
+
+        if market is NOT_MODIFIED:
+            market = cached_market
+
+        if market:
+            self._store_market(market_id, (now, market, etag))
+            if self.cache_store:
+                self.cache_store.put_market(market_id, market, etag, time.time())
+
+        return market
+
+    def _store_market(self, market_id: str, entry: tuple[float, dict, Optional[str]]):
+        """Insert a market cache entry, evicting least recently used markets"""
+        with self._cache_lock:
+            self.market_cache[market_id] = entry
+            self.market_cache.move_to_end(market_id)
+            while len(self.market_cache) > MARKET_CACHE_SIZE:
+                self.market_cache.popitem(last=False)
+
+    def _get_user(self, user_id: str) -> Optional[dict]:
+        """Get user details with LRU + TTL caching, None on API failure"""
+        now = time.monotonic()
+        with self._cache_lock:
+            entry = self.user_cache.get(user_id)
+            if entry is not None and now - entry[0] < USER_CACHE_TTL:
+                self.user_cache.move_to_end(user_id)
+                return entry[1]
+
+        if entry is None and self.cache_store:
+            stored = self.cache_store.get_user(user_id, USER_CACHE_TTL)
+            if stored:
+                fetched_at, user = stored
+                self._store_user(user_id, (now - (time.time() - fetched_at), user))
+                return user
+
+        try:
+            user = get_user_by_id(user_id)
+        except ManifoldAPIError:
+            return None  # Continue without user data
+
+        if user:
+            self._store_user(user_id, (now, user))
+            if self.cache_store:
+                self.cache_store.put_user(user_id, user, time.time())
+
+        return user
+
+    def _store_user(self, user_id: str, entry: tuple[float, dict]):
+        """Insert a user cache entry, evicting least recently used users"""
+        with self._cache_lock:
+            self.user_cache[user_id] = entry
+            self.user_cache.move_to_end(user_id)
+            while len(self.user_cache) > USER_CACHE_SIZE:
+                self.user_cache.popitem(last=False)
+
+    def _prefetch(self, bets: list[dict]):
+        """
+        Warm market_cache and user_cache for a batch of bets concurrently.
+
+        Users are only fetched for bets large enough to need user data.
+        """
+        market_ids = {b.get("contractId") for b in bets}
+        market_ids.discard(None)
+        user_ids = {b.get("userId") for b in bets if self.engine.needs_user_data(b)}
+        user_ids.discard(None)
+
+        markets_done = self._pool.map(self._get_market, market_ids)
+        users_done = self._pool.map(self._get_user, user_ids)
+        list(markets_done)  # Wait for all fetches to finish
+        list(users_done)
 
     def _process_bet(self, bet: dict) -> list[Alert]:
         """Process a single bet and return any alerts"""
@@ -221,14 +370,11 @@ class AlertBot:
                 "question": bet.get("contractQuestion", "Unknown Market")
             }
 
-        # Get user details for new account and high skill detection
+        # Get user details only when a user-based signal could fire
         user_id = bet.get("userId")
         user_data = None
-        if user_id:
-            try:
-                user_data = get_user_by_id(user_id)
-            except ManifoldAPIError:
-                pass  # Continue without user data
+        if user_id and self.engine.needs_user_data(bet):
+            user_data = self._get_user(user_id)
 
         # Process through signal engine
         return self.engine.process_bet(bet, market, user_data)
@@ -241,6 +387,7 @@ class AlertBot:
             Number of alerts generated
         """
         alerts_this_cycle = 0
+        self.bets_last_cycle = 0
 
         try:
             # Fetch recent bets
@@ -249,6 +396,7 @@ class AlertBot:
                 limit=self.bets_per_scan,
                 after_time=self.last_bet_time
             )
+            self.bets_last_cycle = len(bets)
 
             if not bets:
                 return 0
@@ -260,6 +408,16 @@ class AlertBot:
                 if newest_time > (self.last_bet_time or 0):
                     self.last_bet_time = newest_time
 
+            # Fetch market and user details for the whole batch up front.
+            # This only warms the caches, so a failure here must not drop the batch.
+            try:
+                self._prefetch(bets)
+            except Exception as e:
+                logging.warning("Prefetch failed, fetching per bet instead: %s", e)
+                if self.debug:
+                    import traceback
+                    traceback.print_exc()
+
             # Process each bet (in chronological order)
             for bet in reversed(bets):
                 self.total_bets_processed += 1
@@ -273,21 +431,35 @@ class AlertBot:
                         alerts_this_cycle += 1
 
                 except Exception as e:
-                    logging.error(f"Error processing bet {bet.get('id')}: {e}")
+                    logging.error("Error processing bet %s: %s", bet.get("id"), e)
                     if self.debug:
                         import traceback
                         traceback.print_exc()
 
         except ManifoldAPIError as e:
-            logging.error(f"API error during scan: {e}")
+            logging.error("API error during scan: %s", e)
         except Exception as e:
-            logging.error(f"Unexpected error during scan: {e}")
+            logging.error("Unexpected error during scan: %s", e)
             if self.debug:
                 import traceback
                 traceback.print_exc()
 
         return alerts_this_cycle
 
+    def _adapt_interval(self):
+        """
+        Adjust the wait before the next scan based on the last cycle's volume.
+
+        A full page of bets means we probably missed some, so scan twice as
+        often (down to MIN_SCAN_INTERVAL); a quiet cycle backs off toward the
+        configured scan_interval.
+        """
+        if self.bets_last_cycle >= self.bets_per_scan:
+            floor = min(MIN_SCAN_INTERVAL, self.scan_interval)
+            self.current_interval = max(floor, self.current_interval / 2)
+        elif self.bets_last_cycle < self.bets_per_scan / 4:
+            self.current_interval = min(self.scan_interval, self.current_interval * 1.5)
+
     def run(self):
         """
         Start the main scanning loop.
@@ -297,27 +469,25 @@ class AlertBot:
         self.running = True
         print_banner()
 
-        logging.info(f"Starting scan loop (interval: {self.scan_interval}s)")
+        logging.info("Starting scan loop (interval: %ss)", self.scan_interval)
 
         # Initial scan to establish baseline
         logging.info("Performing initial scan to establish market baselines...")
         initial_bets = get_recent_bets(limit=200)
         if initial_bets:
             self.last_bet_time = initial_bets[0].get("createdTime", 0)
-            logging.info(f"Loaded {len(initial_bets)} recent bets for baseline")
+            logging.info("Loaded %d recent bets for baseline", len(initial_bets))
 
-            # Process initial bets without generating alerts (just build stats)
+            # Process initial bets without generating alerts (just build stats).
+            # Everything needed is on the bet itself, so no market lookups here.
             for bet in reversed(initial_bets):
                 market_id = bet.get("contractId")
                 if market_id:
-                    market = self._get_market(market_id)
-                    if market:
-                        # Just add to stats, don't generate alerts
-                        self.engine._get_market_stats(market_id).add_bet(
-                            abs(bet.get("amount", 0)),
-                            datetime.fromtimestamp(bet.get("createdTime", 0) / 1000, tz=timezone.utc),
-                            bet.get("probAfter", 0)
-                        )
+                    self.engine._get_market_stats(market_id).add_bet(
+                        abs(bet.get("amount", 0)),
+                        bet.get("createdTime", 0) / 1000,
+                        bet.get("probAfter", 0)
+                    )
 
         print(f"\n{Colors.GREEN}Bot ready. Monitoring for signals...{Colors.RESET}\n")
 
@@ -326,6 +496,8 @@ class AlertBot:
                 scan_start = datetime.now(timezone.utc)
 
                 alerts_count = self._scan_cycle()
+                if self.cache_store:
+                    self.cache_store.flush()
 
                 # Print status (only if no alerts were printed)
                 if alerts_count == 0:
@@ -337,16 +509,23 @@ class AlertBot:
                     )
 
                 # Periodic cleanup
-                if self.total_bets_processed % 1000 == 0:
+                if time.monotonic() - self._last_cleanup >= CLEANUP_INTERVAL:
                     self.engine.cleanup_old_data()
+                    self._last_cleanup = time.monotonic()
 
-                # Wait for next scan
-                time.sleep(self.scan_interval)
+                # Wait for next scan (returns early if stop() is called)
+                self._adapt_interval()
+                if self._stop_event.wait(self.current_interval):
+                    break
 
         except KeyboardInterrupt:
             print(f"\n\n{Colors.YELLOW}Shutting down...{Colors.RESET}")
 
         self.running = False
+        # Let running fetches finish before the store they write to is closed
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        if self.cache_store:
+            self.cache_store.close()
         self._print_summary()
 
     def _print_summary(self):
@@ -367,6 +546,7 @@ Markets tracked: {len(self.market_cache)}
     def stop(self):
         """Signal the bot to stop"""
         self.running = False
+        self._stop_event.set()
 
 
 def main():
@@ -378,7 +558,7 @@ def main():
         "--interval", "-i",
         type=int,
         default=45,
-        help="Scan interval in seconds (default: 45)"
+        help="Maximum scan interval in seconds; shortens automatically under heavy bet volume (default: 45)"
     )
     parser.add_argument(
         "--bets", "-b",
@@ -386,6 +566,17 @@ def main():
         default=100,
         help="Number of bets to fetch per scan (default: 100)"
     )
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=8,
+        help="Concurrent API lookups per scan (default: 8)"
+    )
+    parser.add_argument(
+        "--cache-db",
+        default="manifold_cache.db",
+        help='SQLite file keeping market/user caches across restarts, "" to disable (default: manifold_cache.db)'
+    )
     parser.add_argument(
         "--debug", "-d",
         action="store_true",
@@ -406,7 +597,9 @@ def main():
     bot = AlertBot(
         scan_interval=args.interval,
         bets_per_scan=args.bets,
-        debug=args.debug
+        debug=args.debug,
+        fetch_workers=max(1, args.workers),
+        cache_path=args.cache_db or None
     )
 
     # Handle SIGTERM gracefully
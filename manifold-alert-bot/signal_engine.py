@@ -12,14 +12,23 @@ Signal Types (priority order):
 """
 
 import logging
+import time
+from bisect import bisect_left
 from dataclasses import dataclass, field
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone
 from typing import Optional
-from collections import defaultdict
+from collections import OrderedDict, defaultdict, deque
 from enum import Enum
+from operator import itemgetter
 
 logger = logging.getLogger(__name__)
 
+_TIME_OF = itemgetter(0)  # Timestamp of a prob_history entry
+
+SKILL_CACHE_SIZE = 1000  # Users whose skill check result is memoized
+SEEN_ALERTS_SIZE = 10000  # Alert keys remembered for de-duplication
+SEEN_ALERTS_CHECK_EVERY = 1024  # Marks between size checks of seen_alerts
+
 
 class SignalType(Enum):
     """Types of signals the engine can detect"""
@@ -29,9 +38,9 @@ class SignalType(Enum):
     HIGH_SKILL_USER = "HIGH_SKILL_USER"
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class Alert:
-    """Represents a detected alert"""
+    """Represents a detected alert (equality and hash are defined below)"""
     signal_type: SignalType
     market_id: str
     market_name: str
@@ -51,32 +60,40 @@ class Alert:
     def __eq__(self, other):
         if not isinstance(other, Alert):
             return False
-        return self.bet_id == other.bet_id and self.signal_type == other.signal_type
+        return self.bet_id == other.bet_id and self.signal_type is other.signal_type
 
 
 class MarketStats:
     """
     Tracks statistics for a single market.
     Used to calculate rolling averages and detect anomalies.
+
+    Times are epoch seconds (floats) so the window checks are plain
+    float comparisons.
     """
     def __init__(self, market_id: str, window_size: int = 50):
         self.market_id = market_id
         self.window_size = window_size
-        self.bet_amounts: list[float] = []
-        self.prob_history: list[tuple[datetime, float]] = []  # (timestamp, probability)
-        self.last_updated: datetime = None
-
-    def add_bet(self, amount: float, timestamp: datetime, prob_after: float):
-        """Add a bet to the market statistics"""
+        self.bet_amounts: deque[float] = deque(maxlen=window_size)
+        self._bet_sum = 0.0  # Running sum of bet_amounts
+        # (timestamp, probability), oldest first; bets arrive in chronological order
+        self.prob_history: deque[tuple[float, float]] = deque()
+        self.last_updated: Optional[float] = None
+
+    def add_bet(self, amount: float, timestamp: float, prob_after: float,
+                now: Optional[float] = None):
+        """Add a bet to the market statistics (epoch seconds; now defaults to time.time())"""
+        # Keep only the last window_size bets (the deque drops the oldest itself)
+        if len(self.bet_amounts) == self.window_size:
+            self._bet_sum -= self.bet_amounts[0]
         self.bet_amounts.append(amount)
-        # Keep only the last window_size bets
-        if len(self.bet_amounts) > self.window_size:
-            self.bet_amounts = self.bet_amounts[-self.window_size:]
+        self._bet_sum += amount
 
         self.prob_history.append((timestamp, prob_after))
         # Keep only recent probability history (last 10 minutes)
-        cutoff = datetime.now(timezone.utc) - timedelta(minutes=10)
-        self.prob_history = [(t, p) for t, p in self.prob_history if t > cutoff]
+        cutoff = (now or time.time()) - 10 * 60
+        while self.prob_history and self.prob_history[0][0] <= cutoff:
+            self.prob_history.popleft()
 
         self.last_updated = timestamp
 
@@ -84,25 +101,41 @@ class MarketStats:
         """Calculate average bet amount for this market"""
         if not self.bet_amounts:
             return 0.0
-        return sum(self.bet_amounts) / len(self.bet_amounts)
+        return self._bet_sum / len(self.bet_amounts)
 
-    def get_prob_change(self, window_minutes: int = 5) -> Optional[tuple[float, float]]:
+    def get_prob_change(
+        self,
+        window_minutes: int = 5,
+        now: Optional[float] = None
+    ) -> Optional[tuple[float, float]]:
         """
         Get probability change within the specified time window.
 
+        Args:
+            window_minutes: Size of the window ending at now
+            now: Current time in epoch seconds (defaults to time.time())
+
         Returns:
             Tuple of (start_prob, end_prob) or None if insufficient data
         """
         if len(self.prob_history) < 2:
             return None
 
-        cutoff = datetime.now(timezone.utc) - timedelta(minutes=window_minutes)
-        relevant = [(t, p) for t, p in self.prob_history if t >= cutoff]
+        cutoff = (now or time.time()) - window_minutes * 60
 
-        if len(relevant) < 2:
+        # History is ordered, so binary-search the first entry inside the window
+        start = bisect_left(self.prob_history, cutoff, key=_TIME_OF)
+        if len(self.prob_history) - start < 2:
             return None
 
-        return (relevant[0][1], relevant[-1][1])
+        return (self.prob_history[start][1], self.prob_history[-1][1])
+
+
+class _MarketStatsDict(dict):
+    """market_id -> MarketStats, creating the tracker on first access"""
+    def __missing__(self, market_id: str) -> MarketStats:
+        stats = self[market_id] = MarketStats(market_id)
+        return stats
 
 
 class SignalEngine:
@@ -141,14 +174,18 @@ class SignalEngine:
         self.min_profit_for_skill = min_profit_for_skill
 
         # State tracking
-        self.market_stats: dict[str, MarketStats] = {}  # market_id -> MarketStats
-        self.seen_alerts: set[tuple[str, str]] = set()  # (bet_id, signal_type)
+        self.market_stats: dict[str, MarketStats] = _MarketStatsDict()  # market_id -> MarketStats
+        # (bet_id, signal_type) keys in insertion order, used as a bounded set
+        self.seen_alerts: OrderedDict[tuple[str, str], None] = OrderedDict()
+        self._marks_since_check = 0
         self.user_cache: dict[str, dict] = {}  # user_id -> user_data
+        # user_id -> (user_data it was computed from, skill result), LRU order
+        self._skill_cache: OrderedDict[str, tuple[dict, tuple[bool, dict]]] = OrderedDict()
+        # user_id -> epoch seconds at which the account stops being "new"
+        self._new_until: dict[str, float] = {}
 
     def _get_market_stats(self, market_id: str) -> MarketStats:
         """Get or create market stats tracker"""
-        if market_id not in self.market_stats:
-            self.market_stats[market_id] = MarketStats(market_id)
         return self.market_stats[market_id]
 
     def _is_alert_seen(self, bet_id: str, signal_type: SignalType) -> bool:
@@ -159,36 +196,71 @@ class SignalEngine:
     def _mark_alert_seen(self, bet_id: str, signal_type: SignalType):
         """Mark an alert as seen to avoid duplicates"""
         key = (bet_id, signal_type.value)
-        self.seen_alerts.add(key)
+        self.seen_alerts[key] = None
+
+        # Cleanup: Every so often, drop the oldest entries once we track too many
+        self._marks_since_check += 1
+        if self._marks_since_check >= SEEN_ALERTS_CHECK_EVERY:
+            self._marks_since_check = 0
+            while len(self.seen_alerts) > SEEN_ALERTS_SIZE:
+                self.seen_alerts.popitem(last=False)
 
-        # Cleanup: Remove old entries if set gets too large
-        if len(self.seen_alerts) > 10000:
-            # Keep only recent alerts (this is a simple cleanup strategy)
-            self.seen_alerts = set(list(self.seen_alerts)[-5000:])
+    def _is_new_account(
+        self,
+        user_data: dict,
+        now: Optional[float] = None,
+        user_id: Optional[str] = None
+    ) -> bool:
+        """
+        Check if user account was created recently.
 
-    def _is_new_account(self, user_data: dict) -> bool:
-        """Check if user account was created recently"""
+        Args:
+            user_data: User object from API
+            now: Current time in epoch seconds (defaults to time.time())
+            user_id: When given, the cutoff for this user is cached
+        """
         if not user_data:
             return False
 
-        created_time = user_data.get("createdTime")
-        if not created_time:
-            return False
+        new_until = self._new_until.get(user_id) if user_id is not None else None
+        if new_until is None:
+            created_time = user_data.get("createdTime")
+            new_until = created_time / 1000 + self.new_account_days * 86400 if created_time else 0.0
+            if user_id is not None:
+                self._new_until[user_id] = new_until
 
-        created_dt = datetime.fromtimestamp(created_time / 1000, tz=timezone.utc)
-        age = datetime.now(timezone.utc) - created_dt
-        return age.days < self.new_account_days
+        return (now or time.time()) < new_until
 
-    def _is_high_skill_user(self, user_data: dict) -> tuple[bool, dict]:
+    def _is_high_skill_user(self, user_data: dict, user_id: Optional[str] = None) -> tuple[bool, dict]:
         """
         Check if user has a strong track record.
 
+        Results are memoized per user_id for as long as the same user_data
+        object is passed in; a refreshed user object is re-evaluated.
+
         Returns:
             Tuple of (is_high_skill, details_dict)
         """
         if not user_data:
             return False, {}
 
+        if user_id is not None:
+            cached = self._skill_cache.get(user_id)
+            if cached is not None and cached[0] is user_data:
+                self._skill_cache.move_to_end(user_id)
+                return cached[1]
+
+        result = self._compute_skill(user_data)
+
+        if user_id is not None:
+            self._skill_cache[user_id] = (user_data, result)
+            if len(self._skill_cache) > SKILL_CACHE_SIZE:
+                self._skill_cache.popitem(last=False)
+
+        return result
+
+    def _compute_skill(self, user_data: dict) -> tuple[bool, dict]:
+        """Evaluate the skill metrics of a user object"""
         details = {}
 
         # Check profit metrics
@@ -216,6 +288,22 @@ class SignalEngine:
 
         return is_high_skill, details
 
+    def needs_user_data(self, bet: dict) -> bool:
+        """
+        Check whether a bet is large enough for a user-based signal to fire.
+
+        NEW_ACCOUNT_LARGE_BET needs an above-average bet and HIGH_SKILL_USER
+        needs at least half the whale minimum, so smaller bets can be
+        processed without fetching the user.
+        """
+        amount = abs(bet.get("amount", 0))
+        if amount >= self.min_bet_for_whale / 2:
+            return True
+
+        stats = self.market_stats.get(bet.get("contractId"))
+        avg_bet = stats.get_average_bet() if stats else 0.0
+        return avg_bet > 0 and amount > avg_bet
+
     def process_bet(
         self,
         bet: dict,
@@ -234,6 +322,7 @@ class SignalEngine:
             List of Alert objects (may be empty)
         """
         alerts = []
+        now = time.time()  # Shared by every time-based check below
 
         # Extract bet information
         bet_id = bet.get("id", "unknown")
@@ -247,117 +336,77 @@ class SignalEngine:
 
         # Parse timestamp
         created_time = bet.get("createdTime", 0)
-        timestamp = datetime.fromtimestamp(created_time / 1000, tz=timezone.utc)
+        ts = created_time / 1000  # Epoch seconds for the market windows
+        timestamp = datetime.fromtimestamp(ts, tz=timezone.utc)
 
         # Update market statistics
         stats = self._get_market_stats(market_id)
         avg_bet = stats.get_average_bet()
-        stats.add_bet(amount, timestamp, prob_after)
+        stats.add_bet(amount, ts, prob_after, now)
 
         # Cache user data if provided
         if user_data and user_id:
             self.user_cache[user_id] = user_data
 
+        def emit(signal_type: SignalType, start_prob: float, end_prob: float, details: dict):
+            """Record an alert for this bet unless it was already raised"""
+            if self._is_alert_seen(bet_id, signal_type):
+                return
+            alerts.append(Alert(
+                signal_type=signal_type,
+                market_id=market_id,
+                market_name=market_name,
+                user_id=user_id,
+                username=username,
+                bet_amount=amount,
+                prob_before=start_prob,
+                prob_after=end_prob,
+                timestamp=timestamp,
+                bet_id=bet_id,
+                details=details
+            ))
+            self._mark_alert_seen(bet_id, signal_type)
+
         # 1. WHALE BET DETECTION
-        # Check if bet is ≥5x the market average (with minimum threshold)
-        if avg_bet > 0 and amount >= self.whale_threshold * avg_bet and amount >= self.min_bet_for_whale:
-            if not self._is_alert_seen(bet_id, SignalType.WHALE_BET):
-                alerts.append(Alert(
-                    signal_type=SignalType.WHALE_BET,
-                    market_id=market_id,
-                    market_name=market_name,
-                    user_id=user_id,
-                    username=username,
-                    bet_amount=amount,
-                    prob_before=prob_before,
-                    prob_after=prob_after,
-                    timestamp=timestamp,
-                    bet_id=bet_id,
-                    details={
-                        "market_avg_bet": avg_bet,
-                        "multiplier": amount / avg_bet if avg_bet > 0 else 0
-                    }
-                ))
-                self._mark_alert_seen(bet_id, SignalType.WHALE_BET)
+        # Check if bet is ≥5x the market average (with minimum threshold).
+        # The absolute minimum goes first: it rejects almost every bet.
+        if amount >= self.min_bet_for_whale and avg_bet > 0 and amount >= self.whale_threshold * avg_bet:
+            emit(SignalType.WHALE_BET, prob_before, prob_after, {
+                "market_avg_bet": avg_bet,
+                "multiplier": amount / avg_bet
+            })
 
         # 2. NEW ACCOUNT + LARGE BET DETECTION
-        if user_data and self._is_new_account(user_data):
-            # New account placing above-average bet
-            if avg_bet > 0 and amount > avg_bet:
-                if not self._is_alert_seen(bet_id, SignalType.NEW_ACCOUNT_LARGE_BET):
-                    created_time_user = user_data.get("createdTime", 0)
-                    created_dt = datetime.fromtimestamp(created_time_user / 1000, tz=timezone.utc)
-                    account_age_days = (datetime.now(timezone.utc) - created_dt).days
-
-                    alerts.append(Alert(
-                        signal_type=SignalType.NEW_ACCOUNT_LARGE_BET,
-                        market_id=market_id,
-                        market_name=market_name,
-                        user_id=user_id,
-                        username=username,
-                        bet_amount=amount,
-                        prob_before=prob_before,
-                        prob_after=prob_after,
-                        timestamp=timestamp,
-                        bet_id=bet_id,
-                        details={
-                            "account_age_days": account_age_days,
-                            "market_avg_bet": avg_bet
-                        }
-                    ))
-                    self._mark_alert_seen(bet_id, SignalType.NEW_ACCOUNT_LARGE_BET)
+        # New account placing above-average bet
+        if user_data and avg_bet > 0 and amount > avg_bet and self._is_new_account(user_data, now, user_id):
+            account_age_days = int((now - user_data.get("createdTime", 0) / 1000) // 86400)
+            emit(SignalType.NEW_ACCOUNT_LARGE_BET, prob_before, prob_after, {
+                "account_age_days": account_age_days,
+                "market_avg_bet": avg_bet
+            })
 
         # 3. SHARP MOVEMENT DETECTION
-        # Check if probability moved ≥10% in the last 5 minutes
-        prob_change = stats.get_prob_change(self.sharp_movement_window)
-        if prob_change:
-            start_prob, end_prob = prob_change
-            change = abs(end_prob - start_prob)
-
-            if change >= self.sharp_movement_threshold:
-                # Create alert for this bet if it contributed to the movement
-                if not self._is_alert_seen(bet_id, SignalType.SHARP_MOVEMENT):
-                    # Only alert if this bet was a significant contributor
-                    bet_contribution = abs(prob_after - prob_before)
-                    if bet_contribution >= 0.02:  # At least 2% movement from this bet
-                        alerts.append(Alert(
-                            signal_type=SignalType.SHARP_MOVEMENT,
-                            market_id=market_id,
-                            market_name=market_name,
-                            user_id=user_id,
-                            username=username,
-                            bet_amount=amount,
-                            prob_before=start_prob,
-                            prob_after=end_prob,
-                            timestamp=timestamp,
-                            bet_id=bet_id,
-                            details={
-                                "total_movement": change,
-                                "window_minutes": self.sharp_movement_window,
-                                "bet_contribution": bet_contribution
-                            }
-                        ))
-                        self._mark_alert_seen(bet_id, SignalType.SHARP_MOVEMENT)
+        # Check if probability moved ≥10% in the last 5 minutes.
+        # Only bets that were a significant contributor can alert, so check
+        # the bet's own movement before looking at the window.
+        bet_contribution = abs(prob_after - prob_before)
+        if bet_contribution >= 0.02:  # At least 2% movement from this bet
+            prob_change = stats.get_prob_change(self.sharp_movement_window, now)
+            if prob_change:
+                start_prob, end_prob = prob_change
+                change = abs(end_prob - start_prob)
+                if change >= self.sharp_movement_threshold:
+                    emit(SignalType.SHARP_MOVEMENT, start_prob, end_prob, {
+                        "total_movement": change,
+                        "window_minutes": self.sharp_movement_window,
+                        "bet_contribution": bet_contribution
+                    })
 
         # 4. HIGH SKILL USER DETECTION
         if user_data:
-            is_high_skill, skill_details = self._is_high_skill_user(user_data)
+            is_high_skill, skill_details = self._is_high_skill_user(user_data, user_id)
             if is_high_skill and amount >= self.min_bet_for_whale / 2:  # Lower threshold for known skilled users
-                if not self._is_alert_seen(bet_id, SignalType.HIGH_SKILL_USER):
-                    alerts.append(Alert(
-                        signal_type=SignalType.HIGH_SKILL_USER,
-                        market_id=market_id,
-                        market_name=market_name,
-                        user_id=user_id,
-                        username=username,
-                        bet_amount=amount,
-                        prob_before=prob_before,
-                        prob_after=prob_after,
-                        timestamp=timestamp,
-                        bet_id=bet_id,
-                        details=skill_details
-                    ))
-                    self._mark_alert_seen(bet_id, SignalType.HIGH_SKILL_USER)
+                emit(SignalType.HIGH_SKILL_USER, prob_before, prob_after, skill_details)
 
         return alerts
 
@@ -376,7 +425,7 @@ class SignalEngine:
         Args:
             max_age_hours: Remove markets not updated in this many hours
         """
-        cutoff = datetime.now(timezone.utc) - timedelta(hours=max_age_hours)
+        cutoff = time.time() - max_age_hours * 3600
         markets_to_remove = [
             market_id for market_id, stats in self.market_stats.items()
             if stats.last_updated and stats.last_updated < cutoff
@@ -385,5 +434,12 @@ class SignalEngine:
         for market_id in markets_to_remove:
             del self.market_stats[market_id]
 
+        # Accounts that are no longer new need no cached cutoff
+        now = time.time()
+        self._new_until = {
+            user_id: new_until for user_id, new_until in self._new_until.items()
+            if new_until > now
+        }
+
         if markets_to_remove:
-            logger.info(f"Cleaned up {len(markets_to_remove)} old market stats")
+            logger.info("Cleaned up %d old market stats", len(markets_to_remove))
@@ -4,27 +4,61 @@ Analyse des profils X/Twitter pour détecter la pertinence marketing/copywriting
 """
 
 import re
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional
 from collections import Counter
+from operator import attrgetter
 from dataclasses import dataclass, asdict
 import json
 
+# Nombre de mots-clés personnalisés à partir duquel une alternance regex
+# (un seul passage sur le texte) bat les appels répétés à str.count
+CUSTOM_REGEX_MIN = 12
+
+
+def _keywords_overlap(keywords: List[str]) -> bool:
+    """Indique si deux mots-clés peuvent se chevaucher dans un texte"""
+    for i, a in enumerate(keywords):
+        for j, b in enumerate(keywords):
+            if i == j:
+                continue
+            if a in b or any(a.endswith(b[:n]) for n in range(1, min(len(a), len(b)))):
+                return True
+    return False
+
+
+# Les dataclasses déclarent __slots__ à la main (dataclass(slots=True) exige
+# Python 3.10) : pas de __dict__ par instance, accès aux attributs plus rapide
 
 @dataclass
 class Profile:
     """Représente un profil X avec ses données"""
+    __slots__ = ('username', 'bio', 'tweets', '_text_lower')
+
     username: str
     bio: str
     tweets: List[str]
 
+    def __post_init__(self):
+        self._text_lower: Optional[str] = None
+
     def get_all_text(self) -> str:
         """Retourne tout le texte du profil concaténé"""
         return f"{self.bio} {' '.join(self.tweets)}"
 
+    @property
+    def text_lower(self) -> str:
+        """Texte complet en minuscules, calculé une seule fois par profil"""
+        if self._text_lower is None:
+            self._text_lower = self.get_all_text().lower()
+        return self._text_lower
+
 
 @dataclass
 class AnalysisResult:
     """Résultat d'analyse d'un profil"""
+    __slots__ = ('username', 'score', 'themes', 'signals', 'explanation',
+                 'keyword_matches', 'activity_level')
+
     username: str
     score: float
     themes: List[str]
@@ -81,6 +115,18 @@ class ProfileAnalyzer:
         ]
     }
 
+    # Libellés affichés pour chaque signal
+    _SIGNAL_NAMES = {
+        'needs_help': 'Recherche d\'aide',
+        'selling': 'Vend actuellement',
+        'improving': 'Cherche à optimiser',
+        'creating': 'Lance un projet'
+    }
+
+    # Libellés et points d'activité par niveau (0 = inactif ... 3 = très actif)
+    _ACTIVITY_LABELS = ("Inactif", "Peu actif", "Actif", "Très actif")
+    _ACTIVITY_POINTS = (0, 1, 3, 5)
+
     # Mots-clés liés aux accroches/copywriting
     HOOK_KEYWORDS = [
         'accroche', 'hook', 'titre', 'headline', 'premier paragraphe',
@@ -102,15 +148,32 @@ class ProfileAnalyzer:
         self.language = language
         self.min_activity = min_activity
 
+        # Mots-clés figés en tuples par catégorie, libellés des signaux résolus d'avance
+        self._theme_keywords = tuple(
+            (theme, tuple(keywords)) for theme, keywords in self.THEMES.items()
+        )
+        self._signal_keywords = tuple(
+            (self._SIGNAL_NAMES.get(signal_type, signal_type), tuple(keywords))
+            for signal_type, keywords in self.INTENT_SIGNALS.items()
+        )
+        self._hook_keywords = tuple(self.HOOK_KEYWORDS)
+
+        # Sans chevauchement possible, une alternance compte exactement comme
+        # str.count, mot-clé par mot-clé, en un seul passage
+        distinct = list(dict.fromkeys(self.custom_keywords))
+        self._custom_re = None
+        if len(distinct) >= CUSTOM_REGEX_MIN and all(distinct) and not _keywords_overlap(distinct):
+            self._custom_re = re.compile('|'.join(map(re.escape, distinct)))
+
     def analyze_profile(self, profile: Profile) -> AnalysisResult:
         """Analyse un profil et retourne le scoring complet"""
 
-        text = profile.get_all_text().lower()
+        text = profile.text_lower
 
-        # Détection des thématiques
+        # Détection des thématiques (nom -> nombre de mentions)
         themes = self._detect_themes(text)
 
-        # Détection des signaux d'intention
+        # Détection des signaux d'intention (libellé -> nombre de mentions)
         signals = self._detect_signals(text)
 
         # Correspondance avec mots-clés personnalisés
@@ -120,60 +183,75 @@ class ProfileAnalyzer:
         hook_keywords_found = self._match_hook_keywords(text)
 
         # Niveau d'activité
-        activity_level = self._assess_activity(profile)
+        tweet_count = len(profile.tweets)
+        activity_code = self._activity_code(tweet_count)
+        activity_level = self._assess_activity(tweet_count, activity_code)
 
         # Calcul du score
         score = self._calculate_score(
             themes, signals, keyword_matches,
-            hook_keywords_found, activity_level
+            hook_keywords_found, activity_code
         )
 
+        # Mise en forme des comptes, partagée par le résultat et l'explication
+        theme_labels = self._format_mentions(themes)
+        signal_labels = self._format_mentions(signals)
+
         # Génération de l'explication
         explanation = self._generate_explanation(
-            score, themes, signals, keyword_matches,
+            score, theme_labels, signal_labels, keyword_matches,
             hook_keywords_found, activity_level
         )
 
         return AnalysisResult(
             username=profile.username,
             score=round(score, 2),
-            themes=themes,
-            signals=signals,
+            themes=theme_labels,
+            signals=signal_labels,
             explanation=explanation,
             keyword_matches=keyword_matches,
             activity_level=activity_level
         )
 
-    def _detect_themes(self, text: str) -> List[str]:
+    def _detect_themes(self, text: str) -> Dict[str, int]:
         """Détecte les thématiques principales dans le texte"""
-        detected = []
+        detected = {}
 
-        for theme, keywords in self.THEMES.items():
-            matches = sum(1 for kw in keywords if kw in text)
+        for theme, keywords in self._theme_keywords:
+            matches = 0
+            for kw in keywords:
+                if kw in text:
+                    matches += 1
             if matches > 0:
-                detected.append(f"{theme} ({matches} mentions)")
+                detected[theme] = matches
 
         return detected
 
-    def _detect_signals(self, text: str) -> List[str]:
+    def _detect_signals(self, text: str) -> Dict[str, int]:
         """Détecte les signaux d'intention dans le texte"""
-        detected = []
+        detected = {}
 
-        for signal_type, keywords in self.INTENT_SIGNALS.items():
-            matches = sum(1 for kw in keywords if kw in text)
+        for signal_name, keywords in self._signal_keywords:
+            matches = 0
+            for kw in keywords:
+                if kw in text:
+                    matches += 1
             if matches > 0:
-                signal_name = {
-                    'needs_help': 'Recherche d\'aide',
-                    'selling': 'Vend actuellement',
-                    'improving': 'Cherche à optimiser',
-                    'creating': 'Lance un projet'
-                }.get(signal_type, signal_type)
-                detected.append(f"{signal_name} ({matches} mentions)")
+                detected[signal_name] = matches
 
         return detected
 
+    @staticmethod
+    def _format_mentions(matches: Dict[str, int]) -> List[str]:
+        """Met en forme des comptes en libellés « nom (N mentions) »"""
+        return [f"{name} ({count} mentions)" for name, count in matches.items()]
+
     def _match_custom_keywords(self, text: str) -> Dict[str, int]:
         """Compte les occurrences des mots-clés personnalisés"""
+        if self._custom_re is not None:
+            counts = Counter(self._custom_re.findall(text))
+            return {kw: counts[kw] for kw in self.custom_keywords if kw in counts}
+
         matches = {}
         for keyword in self.custom_keywords:
             count = text.count(keyword)
@@ -183,24 +261,33 @@ class ProfileAnalyzer:
 
     def _match_hook_keywords(self, text: str) -> int:
         """Compte les mots-clés liés aux accroches"""
-        return sum(1 for kw in self.HOOK_KEYWORDS if kw in text)
-
-    def _assess_activity(self, profile: Profile) -> str:
-        """Évalue le niveau d'activité du profil"""
-        tweet_count = len(profile.tweets)
+        matches = 0
+        for kw in self._hook_keywords:
+            if kw in text:
+                matches += 1
+        return matches
 
+    @staticmethod
+    def _activity_code(tweet_count: int) -> int:
+        """Code entier du niveau d'activité (0 = inactif ... 3 = très actif)"""
         if tweet_count == 0:
-            return "Inactif (0 tweet)"
+            return 0
         elif tweet_count < 3:
-            return f"Peu actif ({tweet_count} tweets)"
+            return 1
         elif tweet_count < 10:
-            return f"Actif ({tweet_count} tweets)"
+            return 2
         else:
-            return f"Très actif ({tweet_count} tweets)"
+            return 3
+
+    def _assess_activity(self, tweet_count: int, activity_code: int) -> str:
+        """Évalue le niveau d'activité du profil à partir de son code d'activité"""
+        if tweet_count == 0:
+            return "Inactif (0 tweet)"
+        return f"{self._ACTIVITY_LABELS[activity_code]} ({tweet_count} tweets)"
 
-    def _calculate_score(self, themes: List[str], signals: List[str],
+    def _calculate_score(self, themes: Dict[str, int], signals: Dict[str, int],
                          keyword_matches: Dict[str, int], hook_keywords: int,
-                         activity_level: str) -> float:
+                         activity_code: int) -> float:
         """Calcule le score de pertinence (0-100)"""
 
         score = 0.0
@@ -222,12 +309,7 @@ class ProfileAnalyzer:
         score += hook_score
 
         # Niveau d'activité (max 5 points)
-        if "Très actif" in activity_level:
-            score += 5
-        elif "Actif" in activity_level:
-            score += 3
-        elif "Peu actif" in activity_level:
-            score += 1
+        score += self._ACTIVITY_POINTS[activity_code]
 
         return min(score, 100)
 
@@ -273,7 +355,7 @@ class ProfileAnalyzer:
     def analyze_batch(self, profiles: List[Profile]) -> List[AnalysisResult]:
         """Analyse un lot de profils et retourne les résultats triés par score"""
         results = [self.analyze_profile(p) for p in profiles]
-        return sorted(results, key=lambda r: r.score, reverse=True)
+        return sorted(results, key=attrgetter('score'), reverse=True)
 
     def export_to_dict(self, results: List[AnalysisResult]) -> List[Dict]:
         """Exporte les résultats en format dictionnaire"""
@@ -3,23 +3,217 @@ X Profile Analyzer - Application Web SÉCURISÉE
 Interface simple pour analyser des profils X/Twitter avec authentification
 """
 
-from flask import Flask, render_template, request, jsonify, send_file
-from analyzer import ProfileAnalyzer, Profile, AnalysisResult
+from flask import Flask, Response, g, render_template, request, jsonify
+from flask.json.provider import DefaultJSONProvider
+from analyzer import ProfileAnalyzer, Profile
 import csv
-import io
+import hashlib
+import hmac
 import json
+import logging
 import os
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from typing import List
+from typing import List, Tuple
 from functools import wraps
+from itertools import starmap
+
+try:
+    import orjson
+except ImportError:  # orjson est optionnel : Flask garde alors le module json standard
+    orjson = None
+
+try:
+    from flask_compress import Compress
+except ImportError:  # flask-compress est optionnel : réponses non compressées
+    Compress = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Fournisseur JSON de Flask basé sur orjson (sortie compacte, en UTF-8)"""
+
+    def dumps(self, obj, **kwargs) -> str:
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+
+# Compression des exports (CSV/JSON très répétitifs) et des réponses de /analyze
+if Compress is not None:
+    app.config['COMPRESS_MIMETYPES'] = ['text/csv', 'application/json', 'text/html']
+    app.config['COMPRESS_MIN_SIZE'] = 1024
+    Compress(app)
 
 # Clé API pour sécuriser l'accès (à définir dans les variables d'environnement Render)
 API_KEY = os.environ.get('API_KEY', 'change_moi_en_production_xyz789')
 
-# Stockage en mémoire des résultats d'analyse
-analysis_history: List[AnalysisResult] = []
+# Dernière analyse en mémoire : (résultats déjà sous forme de dictionnaires,
+# partie fixe de l'export JSON sérialisée une seule fois, ETag de cet export).
+# Remplacée d'un seul bloc pour que les threads ne lisent jamais un mélange
+# de l'ancienne et de la nouvelle analyse
+analysis_state: Tuple[List[dict], str, str] = ([], '', '')
+
+# Avec plusieurs workers gunicorn, la mémoire n'est pas partagée : si REDIS_URL
+# est défini, l'historique est conservé dans Redis (module redis requis)
+REDIS_URL = os.environ.get('REDIS_URL')
+HISTORY_KEY = 'x_profile_analyzer:history'
+HISTORY_TTL = 3600  # secondes
+
+redis_client = None
+if REDIS_URL:
+    import redis
+    redis_client = redis.Redis.from_url(REDIS_URL)
+
+
+def export_etag(export: bytes) -> str:
+    """Empreinte courte d'un export, utilisée comme ETag"""
+    return hashlib.blake2b(export, digest_size=16).hexdigest()
+
+
+def save_history(results_json: List[dict]):
+    """Enregistre les résultats de la dernière analyse et leur export JSON"""
+    global analysis_state
+    export = app.json.dumps(
+        {'profiles': results_json, 'total_profiles': len(results_json)},
+        sort_keys=True, separators=(',', ':')
+    )
+    if redis_client is not None:
+        redis_client.setex(HISTORY_KEY, HISTORY_TTL, export)
+    else:
+        analysis_state = (results_json, export, export_etag(export.encode('utf-8')))
+
+
+def load_history() -> Tuple[List[dict], str]:
+    """
+    Retourne les résultats de la dernière analyse
+
+    Returns:
+        Tuple (résultats, ETag) ; liste vide et '' si aucune analyse
+    """
+    if redis_client is not None:
+        raw = redis_client.get(HISTORY_KEY)
+        if not raw:
+            return [], ''
+        return app.json.loads(raw)['profiles'], export_etag(raw)
+    history, _, etag = analysis_state
+    return history, etag
+
+
+def load_export() -> Tuple[str, str]:
+    """
+    Retourne l'export JSON pré-sérialisé de la dernière analyse
+
+    Returns:
+        Tuple (export, ETag) ; ('', '') si aucune analyse
+    """
+    if redis_client is not None:
+        raw = redis_client.get(HISTORY_KEY)
+        return (raw.decode('utf-8'), export_etag(raw)) if raw else ('', '')
+    _, export, etag = analysis_state
+    return export, etag
+
+
+# Analyseurs réutilisés d'une requête à l'autre, par configuration (LRU)
+ANALYZER_CACHE_SIZE = 128
+_analyzer_cache: 'OrderedDict[tuple, ProfileAnalyzer]' = OrderedDict()
+_analyzer_cache_lock = threading.Lock()
+
+
+def get_analyzer(custom_keywords: List[str], language: str, min_activity: int) -> ProfileAnalyzer:
+    """
+    Retourne un analyseur pour cette configuration, construit une seule fois
+
+    L'ordre des mots-clés fait partie de la clé : il fixe l'ordre de
+    keyword_matches dans les résultats.
+    """
+    key = (tuple(custom_keywords), language, min_activity)
+    with _analyzer_cache_lock:
+        analyzer = _analyzer_cache.get(key)
+        if analyzer is not None:
+            _analyzer_cache.move_to_end(key)
+            return analyzer
+
+    analyzer = ProfileAnalyzer(
+        custom_keywords=custom_keywords,
+        language=language,
+        min_activity=min_activity
+    )
+    with _analyzer_cache_lock:
+        _analyzer_cache[key] = analyzer
+        if len(_analyzer_cache) > ANALYZER_CACHE_SIZE:
+            _analyzer_cache.popitem(last=False)
+    return analyzer
+
+
+# Niveaux de pertinence de l'export CSV : (score minimum, libellé), du plus haut au plus bas
+LEVELS = ((70, 'TRÈS PERTINENT'), (50, 'PERTINENT'), (30, 'MOYEN'), (0, 'PEU PERTINENT'))
+
+# Mise en forme d'un mot-clé trouvé dans l'export CSV : « mot (xN) »
+_KEYWORD_MATCH = '{} (x{})'.format
+
+
+def validate_payload(data: dict) -> str:
+    """
+    Vérifie la structure du body de /analyze en une passe
+
+    Returns:
+        Message d'erreur, ou chaîne vide si le body est valide
+    """
+    profiles_data = data.get('profiles', [])
+    if not isinstance(profiles_data, list):
+        return "'profiles' doit être une liste"
+    for p in profiles_data:
+        if not isinstance(p, dict):
+            return "Chaque profil doit être un objet"
+        for field in ('username', 'bio', 'tweets'):
+            if not isinstance(p.get(field, ''), str):
+                return f"Le champ '{field}' d'un profil doit être une chaîne"
+
+    keywords = data.get('keywords', [])
+    if not isinstance(keywords, list) or not all(isinstance(kw, str) for kw in keywords):
+        return "'keywords' doit être une liste de chaînes"
+
+    if not isinstance(data.get('language', 'fr'), str):
+        return "'language' doit être une chaîne"
+
+    if not isinstance(data.get('min_activity', 1), int):
+        return "'min_activity' doit être un entier"
+
+    return ''
+
+
+def format_timestamp(now: datetime) -> str:
+    """Horodatage des exports au format AAAAMMJJ_HHMMSS (sans passer par strftime)"""
+    return (f'{now.year:04d}{now.month:02d}{now.day:02d}_'
+            f'{now.hour:02d}{now.minute:02d}{now.second:02d}')
+
+
+class _Echo:
+    """Pseudo-fichier pour csv.writer : renvoie la ligne au lieu de l'écrire"""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def get_json_body() -> dict:
+    """Retourne le body JSON (objet) de la requête, parsé une seule fois par requête"""
+    if 'json_body' not in g:
+        body = request.get_json(silent=True)
+        g.json_body = body if isinstance(body, dict) else {}
+    return g.json_body
 
 
 def require_api_key(f):
@@ -27,12 +221,14 @@ def require_api_key(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
         # Récupérer la clé depuis le header ou le body JSON
+        # (le header évite de parser le body avant d'être authentifié)
         provided_key = request.headers.get('X-API-Key')
         
         if not provided_key and request.is_json:
-            provided_key = request.get_json().get('api_key')
+            provided_key = get_json_body().get('api_key')
         
-        if not provided_key or provided_key != API_KEY:
+        # Comparaison en temps constant (pas de fuite via le temps de réponse)
+        if not provided_key or not hmac.compare_digest(str(provided_key).encode(), API_KEY.encode()):
             return jsonify({
                 'error': 'Clé API manquante ou invalide',
                 'message': 'Fournissez votre clé API dans le header X-API-Key ou dans le body JSON'
@@ -54,7 +250,12 @@ def index():
 def analyze():
     """Endpoint pour analyser des profils - PROTÉGÉ"""
     try:
-        data = request.get_json()
+        data = get_json_body()
+
+        # Validation de la structure (erreur 400 plutôt qu'une exception)
+        error = validate_payload(data)
+        if error:
+            return jsonify({'error': error}), 400
 
         # Récupération des paramètres
         profiles_data = data.get('profiles', [])
@@ -66,44 +267,32 @@ def analyze():
         if not profiles_data:
             return jsonify({'error': 'Aucun profil fourni'}), 400
 
-        # Création des objets Profile
-        profiles = []
-        for p in profiles_data:
-            username = p.get('username', '').strip()
-            bio = p.get('bio', '').strip()
-            tweets_text = p.get('tweets', '').strip()
-
-            # Parsing des tweets (un par ligne)
-            tweets = [t.strip() for t in tweets_text.split('\n') if t.strip()]
-
-            if not username:
-                continue
-
-            profiles.append(Profile(
+        # Création des objets Profile (profils sans username ignorés),
+        # tweets parsés un par ligne, \r\n compris
+        profiles = [
+            Profile(
                 username=username,
-                bio=bio,
-                tweets=tweets
-            ))
+                bio=p.get('bio', '').strip(),
+                tweets=[t for t in map(str.strip, p.get('tweets', '').splitlines()) if t]
+            )
+            for p in profiles_data
+            if (username := p.get('username', '').strip())
+        ]
 
         if not profiles:
             return jsonify({'error': 'Aucun profil valide'}), 400
 
         # Analyse
-        analyzer = ProfileAnalyzer(
-            custom_keywords=custom_keywords,
-            language=language,
-            min_activity=min_activity
-        )
+        analyzer = get_analyzer(custom_keywords, language, min_activity)
 
         results = analyzer.analyze_batch(profiles)
 
-        # Sauvegarde dans l'historique
-        global analysis_history
-        analysis_history = results
-
         # Export en format JSON
         results_json = analyzer.export_to_dict(results)
 
+        # Sauvegarde dans l'historique
+        save_history(results_json)
+
         return jsonify({
             'success': True,
             'results': results_json,
@@ -119,60 +308,69 @@ def analyze():
 def export_csv():
     """Exporte les résultats en CSV - PROTÉGÉ"""
     try:
-        if not analysis_history:
+        # Référence locale : une nouvelle analyse pendant le téléchargement
+        # ne doit pas changer les lignes envoyées
+        history, etag = load_history()
+        if not history:
             return "Aucune analyse disponible", 404
 
-        # Création du CSV en mémoire
-        output = io.StringIO()
-        writer = csv.writer(output)
-
-        # En-têtes
-        writer.writerow([
-            'Username',
-            'Score',
-            'Niveau',
-            'Thématiques',
-            'Signaux',
-            'Mots-clés trouvés',
-            'Activité',
-            'Explication'
-        ])
-
-        # Données
-        for result in analysis_history:
-            # Niveau de pertinence
-            if result.score >= 70:
-                level = "TRÈS PERTINENT"
-            elif result.score >= 50:
-                level = "PERTINENT"
-            elif result.score >= 30:
-                level = "MOYEN"
-            else:
-                level = "PEU PERTINENT"
-
-            writer.writerow([
-                result.username,
-                result.score,
-                level,
-                '; '.join(result.themes),
-                '; '.join(result.signals),
-                '; '.join([f"{k} (x{v})" for k, v in result.keyword_matches.items()]),
-                result.activity_level,
-                result.explanation
+        # Même analyse déjà téléchargée : 304 sans corps. Vérifié avant de créer
+        # le générateur, car make_conditional lirait tout le flux pour calculer
+        # Content-Length
+        csv_etag = f'{etag}-csv'
+        if request.if_none_match.contains_weak(csv_etag):
+            response = Response(status=304)
+            response.set_etag(csv_etag)
+            return response
+
+        def generate():
+            """Produit le CSV ligne par ligne, sans le construire en mémoire"""
+            writer = csv.writer(_Echo())
+
+            yield '\ufeff'  # BOM pour Excel
+
+            # En-têtes
+            yield writer.writerow([
+                'Username',
+                'Score',
+                'Niveau',
+                'Thématiques',
+                'Signaux',
+                'Mots-clés trouvés',
+                'Activité',
+                'Explication'
             ])
 
+            # Données
+            for result in history:
+                # Niveau de pertinence
+                level = next((label for threshold, label in LEVELS if result['score'] >= threshold),
+                             LEVELS[-1][1])
+
+                yield writer.writerow([
+                    result['username'],
+                    result['score'],
+                    level,
+                    '; '.join(result['themes']),
+                    '; '.join(result['signals']),
+                    '; '.join(starmap(_KEYWORD_MATCH, result['keyword_matches'].items())),
+                    result['activity_level'],
+                    result['explanation']
+                ])
+
         # Préparation du téléchargement
-        output.seek(0)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        timestamp = format_timestamp(datetime.now())
         filename = f'x_profile_analysis_{timestamp}.csv'
 
-        return send_file(
-            io.BytesIO(output.getvalue().encode('utf-8-sig')),  # BOM pour Excel
+        response = Response(
+            generate(),
             mimetype='text/csv',
-            as_attachment=True,
-            download_name=filename
+            headers={'Content-Disposition': f'attachment; filename={filename}'}
         )
 
+        response.set_etag(csv_etag)
+        return response
+
     except Exception as e:
         return f"Erreur lors de l'export: {str(e)}", 500
 
@@ -182,33 +380,25 @@ def export_csv():
 def export_json():
     """Exporte les résultats en JSON - PROTÉGÉ"""
     try:
-        if not analysis_history:
+        export, etag = load_export()
+        if not export:
             return jsonify({'error': 'Aucune analyse disponible'}), 404
 
-        results_dict = [
-            {
-                'username': r.username,
-                'score': r.score,
-                'themes': r.themes,
-                'signals': r.signals,
-                'keyword_matches': r.keyword_matches,
-                'activity_level': r.activity_level,
-                'explanation': r.explanation
-            }
-            for r in analysis_history
-        ]
+        timestamp = format_timestamp(datetime.now())
 
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        # Seule la date d'export change : elle est insérée devant le JSON déjà prêt
+        body = f'{{"export_date":{json.dumps(timestamp)},{export[1:]}'
 
-        response = jsonify({
-            'export_date': timestamp,
-            'total_profiles': len(results_dict),
-            'profiles': results_dict
-        })
-
-        response.headers['Content-Disposition'] = f'attachment; filename=x_profile_analysis_{timestamp}.json'
+        response = Response(
+            body,
+            mimetype='application/json',
+            headers={'Content-Disposition': f'attachment; filename=x_profile_analysis_{timestamp}.json'}
+        )
 
-        return response
+        # Même analyse déjà téléchargée : 304 sans corps. ETag faible, car
+        # export_date change à chaque requête alors que les résultats non
+        response.set_etag(f'{etag}-json', weak=True)
+        return response.make_conditional(request)
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -221,13 +411,11 @@ def health():
 
 
 if __name__ == '__main__':
-    print("=" * 60)
-    print("X PROFILE ANALYZER - Démarrage (VERSION SÉCURISÉE)")
-    print("=" * 60)
-    print("Interface web disponible sur : http://localhost:5000")
-    print(f"Clé API active : {API_KEY[:10]}...")
-    print("Appuyez sur Ctrl+C pour arrêter")
-    print("=" * 60)
-
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+    logger.info("X Profile Analyzer (version sécurisée) démarré sur http://localhost:5000 "
+                "(clé API %s..., Ctrl+C pour arrêter)", API_KEY[:10])
+
+    # Serveur de développement uniquement (en production : gunicorn app:app).
+    # Le débogueur Werkzeug n'est activé que sur demande explicite.
+    app.run(debug=os.environ.get('FLASK_DEV') == '1', host='0.0.0.0', port=5000)
                 
@@ -0,0 +1,18 @@
+"""
+Configuration gunicorn pour la production
+Chargée automatiquement par : gunicorn app:app (depuis ce dossier)
+"""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# Un worker par cœur seulement si l'historique est partagé via Redis :
+# sinon un export pourrait arriver sur un worker qui n'a pas vu l'analyse
+workers = multiprocessing.cpu_count() if os.environ.get('REDIS_URL') else 1
+worker_class = 'gthread'
+threads = 4
+
+# Application importée une fois puis partagée par fork entre les workers
+preload_app = True
@@ -0,0 +1,59 @@
+"""
+Tests des exports de l'application web (client de test Flask)
+"""
+
+from app import API_KEY, app
+
+AUTH = {'X-API-Key': API_KEY}
+
+PROFILES = [
+    {
+        'username': '@marie_copywriter',
+        'bio': "Copywriter freelance | J'aide les entrepreneurs à créer du contenu qui convertit",
+        'tweets': "Comment écrire une accroche qui capte l'attention ?\nLa règle d'or du copywriting"
+    },
+    {
+        'username': '@thomas_dev',
+        'bio': 'Développeur Full Stack | React & Node.js',
+        'tweets': 'Nouveau projet en TypeScript'
+    }
+]
+
+
+def _analyze(client):
+    """Lance une analyse pour alimenter l'historique des exports"""
+    response = client.post('/analyze', json={'profiles': PROFILES}, headers=AUTH)
+    assert response.status_code == 200, f"L'analyse devrait réussir (statut: {response.status_code})"
+
+
+def test_csv_export_is_streamed():
+    """L'export CSV part en flux : pas de Content-Length calculé d'avance"""
+    client = app.test_client()
+    _analyze(client)
+
+    response = client.get('/export/csv', headers=AUTH)
+    assert response.status_code == 200
+    assert 'Content-Length' not in response.headers, "Le CSV ne devrait pas être construit en mémoire"
+    assert response.headers.get('ETag'), "L'export CSV devrait avoir un ETag"
+
+    body = response.get_data(as_text=True)
+    assert '@marie_copywriter' in body and '@thomas_dev' in body
+    print("✅ Export CSV envoyé en flux")
+
+
+def test_csv_export_not_modified():
+    """Un second téléchargement avec le même ETag reçoit un 304 sans corps"""
+    client = app.test_client()
+    _analyze(client)
+
+    etag = client.get('/export/csv', headers=AUTH).headers['ETag']
+    response = client.get('/export/csv', headers={**AUTH, 'If-None-Match': etag})
+    assert response.status_code == 304, f"Le CSV inchangé devrait renvoyer 304 (statut: {response.status_code})"
+    assert response.get_data() == b''
+    print("✅ Export CSV inchangé : 304")
+
+
+if __name__ == "__main__":
+    test_csv_export_is_streamed()
+    test_csv_export_not_modified()
+    print("🎉 TOUS LES TESTS SONT PASSÉS !")